@@ -1,19 +1,35 @@
+import asyncio
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 
+from config.settings import settings
 from services.application_service import app_service
 
+# Search blocks on Vertex AI calls and numpy work, so it runs off the event loop
+EXECUTOR = ThreadPoolExecutor(max_workers=settings.SEARCH_THREADS)
+
 app = FastAPI(
     title="Semantic Search Q&A System",
     description="A production-ready semantic search and question answering system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+@app.on_event("startup")
+async def warmup():
+    """Warm up search and model clients so the first request is not a cold start"""
+    if settings.WARMUP_ON_STARTUP:
+        app_service.warmup()
+
 class SearchRequest(BaseModel):
     query: str
     use_approximate: bool = True
     top_k: int = 1
+    no_cache: bool = False
 
 class SearchResponse(BaseModel):
     success: bool
@@ -40,42 +56,66 @@ async def health_check():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Service unhealthy: {str(e)}")
 
-@app.post("/search", response_model=SearchResponse)
+# Search results are dataclasses that orjson serializes directly, so SearchResponse
+# only documents the schema and responses skip Pydantic validation
+@app.post("/search", response_model=None, responses={200: {"model": SearchResponse}})
 async def semantic_search(request: SearchRequest):
     """Perform semantic search and answer generation"""
     try:
-        result = app_service.search_and_answer(
-            query=request.query,
-            use_approximate=request.use_approximate,
-            k=request.top_k
+        result = await asyncio.get_running_loop().run_in_executor(
+            EXECUTOR,
+            app_service.search_and_answer,
+            request.query,
+            request.use_approximate,
+            request.top_k,
+            request.no_cache
         )
         
-        if not result['success']:
-            raise HTTPException(status_code=400, detail=result['error'])
+        if not result.success:
+            raise HTTPException(status_code=400, detail=result.error)
         
-        return result
+        return ORJSONResponse(result)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/search")
+@app.post("/search/stream")
+async def semantic_search_stream(request: SearchRequest):
+    """Perform semantic search and stream the generated answer as server-sent events"""
+    async def event_stream():
+        async for event in app_service.stream_answer(
+            query=request.query,
+            use_approximate=request.use_approximate,
+            k=request.top_k,
+            no_cache=request.no_cache,
+            executor=EXECUTOR
+        ):
+            yield b"data: " + orjson.dumps(event) + b"\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/search", response_model=None, responses={200: {"model": SearchResponse}})
 async def semantic_search_get(
     query: str = Query(..., description="Search query"),
     use_approximate: bool = Query(True, description="Use approximate search"),
-    top_k: int = Query(1, description="Number of results to return")
+    top_k: int = Query(1, description="Number of results to return"),
+    no_cache: bool = Query(False, description="Bypass the semantic answer cache")
 ):
     """GET endpoint for semantic search"""
     try:
-        result = app_service.search_and_answer(
-            query=query,
-            use_approximate=use_approximate,
-            k=top_k
+        result = await asyncio.get_running_loop().run_in_executor(
+            EXECUTOR,
+            app_service.search_and_answer,
+            query,
+            use_approximate,
+            top_k,
+            no_cache
         )
         
-        if not result['success']:
-            raise HTTPException(status_code=400, detail=result['error'])
+        if not result.success:
+            raise HTTPException(status_code=400, detail=result.error)
         
-        return result
+        return ORJSONResponse(result)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -93,7 +133,6 @@ async def get_document(doc_id: int):
 
 if __name__ == "__main__":
     import uvicorn
-    from config.settings import settings
     
     uvicorn.run(
         "api.routes:app",
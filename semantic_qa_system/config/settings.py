@@ -12,20 +12,48 @@ class Settings:
         # Model configurations
         self.EMBEDDING_MODEL = "textembedding-gecko@001"
         self.GENERATION_MODEL = "text-bison@001"
+        self.EMBEDDING_DIM = 768
+        self.EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
         
         # Search configurations
-        self.SEARCH_NUM_LEAVES = 25
-        self.SEARCH_LEAVES_TO_SEARCH = 10
+        self.SEARCH_INDEX_BACKEND = os.getenv("SEARCH_INDEX_BACKEND", "auto")  # auto, hnsw or scann
+        self.HNSW_MAX_ROWS = 1_000_000
+        self.HNSW_M = 16
+        self.HNSW_EF_CONSTRUCTION = 200
+        self.HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+        # ScaNN leaves default to sqrt(N) and leaves to search to max(4, leaves // 4)
+        self.SEARCH_NUM_LEAVES = int(os.getenv("SEARCH_NUM_LEAVES", "0")) or None
+        self.SEARCH_LEAVES_TO_SEARCH = int(os.getenv("SEARCH_LEAVES_TO_SEARCH", "0")) or None
         self.TRAINING_SAMPLE_SIZE = 2000
+        self.SCANN_SOAR_LAMBDA = 1.5
+        self.SCANN_OVERRETRIEVE_FACTOR = 2.0
+        self.SCANN_REORDER_NUM_NEIGHBORS = 100
+        self.EXACT_SEARCH_ENABLED = os.getenv("EXACT_SEARCH_ENABLED", "true").lower() == "true"
+        self.EXACT_SEARCH_INT8 = os.getenv("EXACT_SEARCH_INT8", "false").lower() == "true"
+        self.NUMBA_EXACT_SEARCH_MAX_ROWS = int(os.getenv("NUMBA_EXACT_SEARCH_MAX_ROWS", "50000"))
         self.MAX_OUTPUT_TOKENS = 1024
         self.TEMPERATURE = 0.2
+        self.GENERATION_MAX_RETRIES = int(os.getenv("GENERATION_MAX_RETRIES", "2"))
+        self.GENERATION_RETRY_BACKOFF_SECONDS = 0.5
+        
+        # Semantic cache configurations
+        self.SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+        self.SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+        self.SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
         
         # Data paths
-        self.DATA_PATH = "data/so_database_app.csv"
-        self.EMBEDDINGS_PATH = "data/question_embeddings_app.pkl"
+        self.DATA_PATH = "data/so_database_app.parquet"
+        self.LEGACY_DATA_PATH = "data/so_database_app.csv"
+        self.EMBEDDINGS_PATH = "data/question_embeddings_app.f32.npy"
+        self.LEGACY_EMBEDDINGS_PATH = "data/question_embeddings_app.pkl"
+        # Name of the shared memory block holding normalized embeddings (empty: load per worker)
+        self.SHARED_EMBEDDINGS_NAME = os.getenv("SHARED_EMBEDDINGS_NAME", "")
         
         # API configurations
         self.API_HOST = os.getenv("API_HOST", "0.0.0.0")
         self.API_PORT = int(os.getenv("API_PORT", "8080"))
+        self.WORKERS = int(os.getenv("WORKERS", "4"))
+        self.SEARCH_THREADS = int(os.getenv("SEARCH_THREADS", "8"))
+        self.WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
 
 settings = Settings()
\ No newline at end of file
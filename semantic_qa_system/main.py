@@ -2,10 +2,20 @@ import uvicorn
 from config.settings import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "api.routes:app",
-        host=settings.API_HOST,
-        port=settings.API_PORT,
-        reload=False,  # Set to False in production
-        workers=4  # Adjust based on your needs
-    )
\ No newline at end of file
+    if settings.SHARED_EMBEDDINGS_NAME:
+        # Publish the normalized embeddings once so all workers share the same pages
+        from scripts.share_embeddings import share_embeddings
+        from utils.shared_memory import unlink_shared_embeddings
+        share_embeddings()
+    
+    try:
+        uvicorn.run(
+            "api.routes:app",
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            reload=False,  # Set to False in production
+            workers=settings.WORKERS
+        )
+    finally:
+        if settings.SHARED_EMBEDDINGS_NAME:
+            unlink_shared_embeddings(settings.SHARED_EMBEDDINGS_NAME)
\ No newline at end of file
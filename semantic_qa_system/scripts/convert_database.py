@@ -0,0 +1,21 @@
+"""One-time conversion of the CSV database to Parquet.
+
+Run from the semantic_qa_system directory:
+
+    python -m scripts.convert_database
+"""
+import pandas as pd
+
+from config.settings import settings
+
+def convert_database(
+    source_path: str = settings.LEGACY_DATA_PATH,
+    target_path: str = settings.DATA_PATH
+) -> None:
+    """Convert the CSV database to a Parquet file that loads without text parsing"""
+    database = pd.read_csv(source_path)
+    database.to_parquet(target_path, engine='pyarrow', index=False)
+    print(f"Saved {len(database)} documents to {target_path}")
+
+if __name__ == "__main__":
+    convert_database()
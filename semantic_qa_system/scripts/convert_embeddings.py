@@ -0,0 +1,25 @@
+"""One-time conversion of the pickled embeddings to a float32 .npy file.
+
+Run from the semantic_qa_system directory:
+
+    python -m scripts.convert_embeddings
+"""
+import pickle
+import numpy as np
+
+from config.settings import settings
+
+def convert_embeddings(
+    source_path: str = settings.LEGACY_EMBEDDINGS_PATH,
+    target_path: str = settings.EMBEDDINGS_PATH
+) -> None:
+    """Convert the pickled embeddings array to a memory-mappable float32 .npy file"""
+    with open(source_path, 'rb') as file:
+        embeddings = pickle.load(file)
+
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    np.save(target_path, embeddings)
+    print(f"Saved {embeddings.shape} float32 embeddings to {target_path}")
+
+if __name__ == "__main__":
+    convert_embeddings()
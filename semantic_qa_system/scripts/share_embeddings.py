@@ -0,0 +1,30 @@
+"""Load the normalized corpus embeddings into POSIX shared memory for all workers.
+
+Run from the semantic_qa_system directory before starting uvicorn (main.py does
+this automatically when SHARED_EMBEDDINGS_NAME is set):
+
+    SHARED_EMBEDDINGS_NAME=qa_embeddings python -m scripts.share_embeddings
+    SHARED_EMBEDDINGS_NAME=qa_embeddings python -m scripts.share_embeddings --unlink
+"""
+import sys
+
+from config.settings import settings
+from utils.helpers import load_embeddings_file, normalize_rows
+from utils.shared_memory import create_shared_embeddings, unlink_shared_embeddings
+
+def share_embeddings(
+    name: str = settings.SHARED_EMBEDDINGS_NAME,
+    source_path: str = settings.EMBEDDINGS_PATH,
+    legacy_path: str = settings.LEGACY_EMBEDDINGS_PATH
+) -> None:
+    """Normalize the embeddings once and publish them under a shared memory name"""
+    embeddings = normalize_rows(load_embeddings_file(source_path, legacy_path))
+    shm = create_shared_embeddings(name, embeddings)
+    shm.close()
+    print(f"Shared {embeddings.shape} normalized embeddings as '{name}'")
+
+if __name__ == "__main__":
+    if "--unlink" in sys.argv[1:]:
+        unlink_shared_embeddings(settings.SHARED_EMBEDDINGS_NAME)
+    else:
+        share_embeddings()
@@ -1,95 +1,280 @@
 import pandas as pd
+import pyarrow.parquet as pq
 import numpy as np
-import pickle
-from typing import Dict, Any, List, Optional
+import os
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, AsyncIterator
 import time
+import logging
 
 from config.settings import settings
 from services.search_service import SearchService
 from services.qa_service import QAService
+from services.cache_service import exact_cache, semantic_cache
+from utils import kernels
+from utils.helpers import load_embeddings_file
+from utils.shared_memory import attach_shared_embeddings
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class SourceDocument:
+    """Document the answer was generated from"""
+    id: int
+    question: str
+    answer: str
+    similarity_score: float
+
+@dataclass(slots=True)
+class SearchResult:
+    """Result of a search-and-answer request, serialized directly by orjson"""
+    success: bool
+    latency_ms: float
+    query: Optional[str] = None
+    answer: Optional[str] = None
+    source_document: Optional[SourceDocument] = None
+    search_method: Optional[str] = None
+    error: Optional[str] = None
 
 class ApplicationService:
     """Main application service coordinating search and Q&A"""
     
     def __init__(self):
         self.database = self._load_database()
-        self.embeddings = self._load_embeddings()
-        self.search_service = SearchService(self.database, self.embeddings)
+        self.shared_memory = None
+        embeddings = self._load_embeddings()
+        self.search_service = SearchService(
+            self.database, embeddings, normalized=self.shared_memory is not None
+        )
         self.qa_service = QAService()
     
     def _load_database(self) -> pd.DataFrame:
         """Load the Stack Overflow database"""
         try:
-            database = pd.read_csv(settings.DATA_PATH)
+            if os.path.exists(settings.DATA_PATH):
+                # Memory-map the file and let Arrow release its buffers as columns convert
+                table = pq.read_table(settings.DATA_PATH, memory_map=True)
+                return table.to_pandas(split_blocks=True, self_destruct=True)
+            
+            # Fall back to the CSV until scripts/convert_database.py has been run
+            database = pd.read_csv(settings.LEGACY_DATA_PATH)
             return database
         except Exception as e:
             raise Exception(f"Failed to load database: {str(e)}")
     
     def _load_embeddings(self) -> np.ndarray:
-        """Load pre-computed embeddings"""
+        """Load pre-computed embeddings as a read-only float32 memory map"""
         try:
-            with open(settings.EMBEDDINGS_PATH, 'rb') as file:
-                embeddings = pickle.load(file)
-            return embeddings
+            if settings.SHARED_EMBEDDINGS_NAME:
+                # Normalized embeddings published by scripts/share_embeddings.py; every
+                # worker maps the same physical pages
+                self.shared_memory, embeddings = attach_shared_embeddings(
+                    settings.SHARED_EMBEDDINGS_NAME
+                )
+                return embeddings
+            
+            return load_embeddings_file()
         except Exception as e:
             raise Exception(f"Failed to load embeddings: {str(e)}")
     
-    def search_and_answer(self, query: str, use_approximate: bool = True, k: int = 1) -> Dict[str, Any]:
+    def retrieve(
+        self,
+        query: str,
+        use_approximate: bool = True,
+        k: int = 1,
+        no_cache: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Find the most relevant document for a query, or a cached answer for it"""
+        # Serve repeated queries from the exact tier without embedding them
+        if not no_cache:
+            cached = exact_cache.lookup(query)
+            if cached is not None:
+                answer, source_document = cached
+                return {
+                    'normalized_query': None,
+                    'answer': answer,
+                    'source_document': source_document,
+                    'context': None,
+                    'search_method': 'cache'
+                }
+        
+        normalized_query = self.search_service.embed_query(query, use_cache=not no_cache)
+        
+        # Serve near-duplicate queries from the semantic cache
+        if not no_cache:
+            cached = semantic_cache.lookup(normalized_query)
+            if cached is not None:
+                answer, source_document = cached
+                return {
+                    'normalized_query': normalized_query,
+                    'answer': answer,
+                    'source_document': source_document,
+                    'context': None,
+                    'search_method': 'cache'
+                }
+        
+        # Perform search
+        if use_approximate:
+            doc_ids, similarities = self.search_service.semantic_search(
+                query, k, normalized_query=normalized_query
+            )
+        else:
+            doc_ids, similarities = self.search_service.exact_search(
+                query, k, normalized_query=normalized_query
+            )
+        
+        # Get the most relevant document
+        best_doc_id = doc_ids[0]
+        best_similarity = similarities[0]
+        document = self.search_service.get_document(best_doc_id)
+        
+        if not document:
+            return None
+        
+        return {
+            'normalized_query': normalized_query,
+            'answer': None,
+            'source_document': SourceDocument(
+                id=document['id'],
+                question=document['question'],
+                answer=document['answer'],
+                similarity_score=best_similarity
+            ),
+            'context': f"Question: {document['question']}\nAnswer: {document['answer']}",
+            'search_method': 'approximate' if use_approximate else 'exact'
+        }
+    
+    def _cache_answer(self, query: str, retrieval: Dict[str, Any], answer: str) -> None:
+        """Store a generated answer in both cache tiers under the same TTL"""
+        exact_cache.store(query, answer, retrieval['source_document'])
+        semantic_cache.store(retrieval['normalized_query'], answer, retrieval['source_document'])
+    
+    def search_and_answer(
+        self,
+        query: str,
+        use_approximate: bool = True,
+        k: int = 1,
+        no_cache: bool = False
+    ) -> SearchResult:
         """Perform semantic search and generate answer"""
         start_time = time.time()
         
         try:
-            # Perform search
-            if use_approximate:
-                doc_ids, similarities = self.search_service.semantic_search(query, k)
-            else:
-                doc_ids, similarities = self.search_service.exact_search(query, k)
+            retrieval = self.retrieve(query, use_approximate, k, no_cache)
             
-            # Get the most relevant document
-            best_doc_id = doc_ids[0]
-            best_similarity = similarities[0]
-            document = self.search_service.get_document(best_doc_id)
+            if retrieval is None:
+                return SearchResult(
+                    success=False,
+                    error='No relevant document found',
+                    latency_ms=(time.time() - start_time) * 1000
+                )
             
-            if not document:
-                return {
-                    'success': False,
+            answer = retrieval['answer']
+            if answer is None:
+                # Generate answer
+                answer = self.qa_service.generate_answer(query, retrieval['context'])
+                
+                if not no_cache:
+                    self._cache_answer(query, retrieval, answer)
+            
+            return SearchResult(
+                success=True,
+                query=query,
+                answer=answer,
+                source_document=retrieval['source_document'],
+                search_method=retrieval['search_method'],
+                latency_ms=(time.time() - start_time) * 1000
+            )
+            
+        except Exception as e:
+            return SearchResult(
+                success=False,
+                error=str(e),
+                latency_ms=(time.time() - start_time) * 1000
+            )
+    
+    async def stream_answer(
+        self,
+        query: str,
+        use_approximate: bool = True,
+        k: int = 1,
+        no_cache: bool = False,
+        executor: Optional[Executor] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Perform semantic search and stream the generated answer as events"""
+        start_time = time.time()
+        
+        try:
+            # Retrieval blocks on the embedding call and numpy work
+            retrieval = await asyncio.get_running_loop().run_in_executor(
+                executor, self.retrieve, query, use_approximate, k, no_cache
+            )
+            
+            if retrieval is None:
+                yield {
+                    'type': 'error',
                     'error': 'No relevant document found',
                     'latency_ms': (time.time() - start_time) * 1000
                 }
+                return
             
-            # Build context
-            context = f"Question: {document['question']}\nAnswer: {document['answer']}"
-            
-            # Generate answer
-            answer = self.qa_service.generate_answer(query, context)
-            
-            return {
-                'success': True,
+            yield {
+                'type': 'source',
                 'query': query,
-                'answer': answer,
-                'source_document': {
-                    'id': document['id'],
-                    'question': document['question'],
-                    'answer': document['answer'],
-                    'similarity_score': best_similarity
-                },
-                'search_method': 'approximate' if use_approximate else 'exact',
-                'latency_ms': (time.time() - start_time) * 1000
+                'source_document': retrieval['source_document'],
+                'search_method': retrieval['search_method']
             }
             
+            if retrieval['answer'] is not None:
+                yield {'type': 'token', 'text': retrieval['answer']}
+            else:
+                chunks = []
+                async for chunk in self.qa_service.generate_answer_stream(query, retrieval['context']):
+                    chunks.append(chunk)
+                    yield {'type': 'token', 'text': chunk}
+                
+                if not no_cache:
+                    self._cache_answer(query, retrieval, "".join(chunks).strip())
+            
+            yield {'type': 'done', 'latency_ms': (time.time() - start_time) * 1000}
+            
         except Exception as e:
-            return {
-                'success': False,
+            yield {
+                'type': 'error',
                 'error': str(e),
                 'latency_ms': (time.time() - start_time) * 1000
             }
     
+    def warmup(self) -> None:
+        """Exercise the search kernels, embedding client and generation client once"""
+        # Local kernels and search must work; a failure here is a bug and aborts startup
+        kernels.warmup()
+        
+        # Vertex AI steps are best effort, since the service may be unreachable (e.g. in CI)
+        try:
+            normalized_query = self.search_service.embed_query("warmup", use_cache=False)
+        except Exception as e:
+            logger.warning("Warm-up embedding request failed: %s", e)
+            dim = self.search_service.embeddings_shape[1]
+            normalized_query = np.full(dim, 1 / np.sqrt(dim), dtype=np.float32)
+        
+        self.search_service.semantic_search("warmup", 1, normalized_query=normalized_query)
+        if settings.EXACT_SEARCH_ENABLED:
+            self.search_service.exact_search("warmup", 1, normalized_query=normalized_query)
+        
+        try:
+            self.qa_service.warmup()
+        except Exception as e:
+            logger.warning("Warm-up generation request failed: %s", e)
+    
     def get_database_info(self) -> Dict[str, Any]:
         """Get information about the loaded database"""
         return {
             'total_documents': len(self.database),
             'columns': self.database.columns.tolist(),
-            'embeddings_shape': self.embeddings.shape
+            'embeddings_shape': self.search_service.embeddings_shape
         }
 
 # Global application service instance
@@ -0,0 +1,172 @@
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+class SemanticCache:
+    """In-process cache of answers keyed by normalized query embeddings"""
+
+    def __init__(
+        self,
+        dim: int = settings.EMBEDDING_DIM,
+        threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: float = settings.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries: int = settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        initial_capacity: int = 64
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Ring buffer: entries live at slots head, head + 1, ... (mod capacity), oldest first
+        capacity = max(1, min(initial_capacity, max_entries))
+        self._embeddings = np.empty((capacity, dim), dtype=np.float32)
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._entries: List[Optional[Tuple[str, Any]]] = [None] * capacity
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, normalized_query: np.ndarray) -> Optional[Tuple[str, Any]]:
+        """Return the cached (answer, source_document) for a near-duplicate query"""
+        with self._lock:
+            self._evict_expired()
+
+            best_slot, best_similarity = -1, -np.inf
+            for start, stop in self._segments():
+                similarities = self._embeddings[start:stop] @ normalized_query
+                best = int(similarities.argmax())
+                if similarities[best] > best_similarity:
+                    best_slot, best_similarity = start + best, similarities[best]
+
+            if best_slot >= 0 and best_similarity >= self.threshold:
+                return self._entries[best_slot]
+            return None
+
+    def store(self, normalized_query: np.ndarray, answer: str, source_document: Any) -> None:
+        """Add a query embedding and its answer to the cache"""
+        with self._lock:
+            self._evict_expired()
+            if self._size >= self.max_entries:
+                self._drop_oldest()
+            if self._size == len(self._embeddings):
+                self._grow()
+
+            slot = (self._head + self._size) % len(self._embeddings)
+            self._embeddings[slot] = normalized_query
+            self._timestamps[slot] = time.monotonic()
+            self._entries[slot] = (answer, source_document)
+            self._size += 1
+
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries = [None] * len(self._embeddings)
+            self._head = 0
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _segments(self) -> Iterator[Tuple[int, int]]:
+        """Contiguous slot ranges holding live entries, oldest first"""
+        capacity = len(self._embeddings)
+        end = self._head + self._size
+        if self._size:
+            yield self._head, min(end, capacity)
+        if end > capacity:
+            yield 0, end - capacity
+
+    def _evict_expired(self) -> None:
+        """Drop entries older than the TTL, scanning from the oldest"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._size and self._timestamps[self._head] < cutoff:
+            self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        """Release the oldest entry by advancing the head"""
+        self._entries[self._head] = None
+        self._head = (self._head + 1) % len(self._embeddings)
+        self._size -= 1
+
+    def _grow(self) -> None:
+        """Double the capacity (up to max_entries), unrolling the ring so the head is slot 0"""
+        capacity = min(2 * len(self._embeddings), self.max_entries)
+        embeddings = np.empty((capacity, self.dim), dtype=np.float32)
+        timestamps = np.empty(capacity, dtype=np.float64)
+        entries: List[Optional[Tuple[str, Any]]] = [None] * capacity
+        offset = 0
+        for start, stop in self._segments():
+            count = stop - start
+            embeddings[offset:offset + count] = self._embeddings[start:stop]
+            timestamps[offset:offset + count] = self._timestamps[start:stop]
+            entries[offset:offset + count] = self._entries[start:stop]
+            offset += count
+        self._embeddings = embeddings
+        self._timestamps = timestamps
+        self._entries = entries
+        self._head = 0
+
+class ExactAnswerCache:
+    """In-process cache of answers keyed by query text, checked before embedding"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries: int = settings.SEMANTIC_CACHE_MAX_ENTRIES
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Insertion order is age order, so the oldest entry is always first
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, query: str) -> Optional[Tuple[str, Any]]:
+        """Return the cached (answer, source_document) for the same query text"""
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(_query_key(query))
+            if entry is None:
+                return None
+            return entry[1], entry[2]
+
+    def store(self, query: str, answer: str, source_document: Any) -> None:
+        """Add a query and its answer to the cache, restarting its TTL"""
+        key = _query_key(query)
+        with self._lock:
+            self._evict_expired()
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[key] = (time.monotonic(), answer, source_document)
+
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict_expired(self) -> None:
+        """Drop entries older than the TTL, scanning from the oldest"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            key, (timestamp, _, _) = next(iter(self._entries.items()))
+            if timestamp >= cutoff:
+                break
+            del self._entries[key]
+
+def _query_key(query: str) -> str:
+    """Collapse whitespace so trivially different spellings share an entry"""
+    return " ".join(query.split())
+
+semantic_cache = SemanticCache()
+exact_cache = ExactAnswerCache()
\ No newline at end of file
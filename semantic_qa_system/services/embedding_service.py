@@ -1,4 +1,5 @@
 import numpy as np
+from functools import lru_cache
 from typing import List, Optional
 from vertexai.language_models import TextEmbeddingModel
 
@@ -17,19 +18,36 @@ class EmbeddingService:
             if len(texts) == 1:
                 # Single embedding
                 embedding = self.model.get_embeddings(texts)[0].values
-                return np.array([embedding])
+                return np.array([embedding], dtype=np.float32)
             else:
                 # Batch embeddings
                 return encode_text_to_embedding_batched(
                     sentences=texts,
                     api_calls_per_second=20/60,
-                    batch_size=5
+                    batch_size=5,
+                    model=self.model
                 )
         except Exception as e:
             raise Exception(f"Failed to get embeddings: {str(e)}")
     
-    def get_single_embedding(self, text: str) -> np.ndarray:
+    def get_single_embedding(self, text: str, use_cache: bool = True) -> np.ndarray:
         """Get embedding for a single text"""
+        # Both paths embed the same normalized text, so no_cache never changes results
+        text = _normalize_query_text(text)
+        if use_cache:
+            return _cached_single_embedding(text)
         return self.get_embeddings([text])[0]
 
+def _normalize_query_text(text: str) -> str:
+    """Collapse whitespace so trivially different queries embed identically"""
+    return " ".join(text.split())
+
+@lru_cache(maxsize=settings.EMBED_CACHE_SIZE)
+def _cached_single_embedding(text: str) -> np.ndarray:
+    """Embed a normalized query string, memoized per process"""
+    embedding = embedding_service.get_embeddings([text])[0]
+    # Cached arrays are shared between callers, so they must not be mutated
+    embedding.flags.writeable = False
+    return embedding
+
 embedding_service = EmbeddingService()
\ No newline at end of file
@@ -1,8 +1,16 @@
-from typing import Dict, Any, Optional
+import asyncio
+import time
+from typing import Dict, Any, Optional, AsyncIterator
 from vertexai.language_models import TextGenerationModel
 
 from config.settings import settings
 
+STATIC_INSTRUCTIONS = """Using the relevant information from the context, provide an answer to the query.
+
+If the context doesn't provide any relevant information, answer with:
+[I couldn't find a good match in the document database for your query]
+"""
+
 class QAService:
     """Service for generating answers using LLM"""
     
@@ -10,28 +18,59 @@ class QAService:
         self.model = TextGenerationModel.from_pretrained(settings.GENERATION_MODEL)
     
     def generate_answer(self, query: str, context: str) -> str:
-        """Generate answer using context and query"""
-        try:
-            prompt = self._build_prompt(query, context)
-            
-            response = self.model.predict(
-                prompt=prompt,
-                temperature=settings.TEMPERATURE,
-                max_output_tokens=settings.MAX_OUTPUT_TOKENS
-            )
-            
-            return response.text.strip()
-        except Exception as e:
-            raise Exception(f"Failed to generate answer: {str(e)}")
+        """Generate answer using context and query, retrying with backoff"""
+        prompt = self._build_prompt(query, context)
+        
+        for attempt in range(settings.GENERATION_MAX_RETRIES + 1):
+            try:
+                response = self.model.predict(
+                    prompt=prompt,
+                    temperature=settings.TEMPERATURE,
+                    max_output_tokens=settings.MAX_OUTPUT_TOKENS
+                )
+                
+                return response.text.strip()
+            except Exception as e:
+                if attempt == settings.GENERATION_MAX_RETRIES:
+                    raise Exception(f"Failed to generate answer: {str(e)}")
+                time.sleep(self._retry_delay(attempt))
+    
+    async def generate_answer_stream(self, query: str, context: str) -> AsyncIterator[str]:
+        """Stream answer chunks as the model produces them"""
+        prompt = self._build_prompt(query, context)
+        
+        for attempt in range(settings.GENERATION_MAX_RETRIES + 1):
+            started = False
+            try:
+                async for response in self.model.predict_streaming_async(
+                    prompt=prompt,
+                    temperature=settings.TEMPERATURE,
+                    max_output_tokens=settings.MAX_OUTPUT_TOKENS
+                ):
+                    started = True
+                    yield response.text
+                return
+            except Exception as e:
+                # Chunks already sent to the client cannot be replayed
+                if started or attempt == settings.GENERATION_MAX_RETRIES:
+                    raise Exception(f"Failed to generate answer: {str(e)}")
+                await asyncio.sleep(self._retry_delay(attempt))
+    
+    def warmup(self) -> None:
+        """Issue a minimal request so the client connection is established before traffic"""
+        self.model.predict(prompt="warmup", temperature=0, max_output_tokens=1)
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff before the next generation attempt"""
+        return settings.GENERATION_RETRY_BACKOFF_SECONDS * (2 ** attempt)
     
     def _build_prompt(self, query: str, context: str) -> str:
         """Build prompt for the generation model"""
-        return f"""Here is the context: {context}
-
-Using the relevant information from the context, provide an answer to the query: "{query}".
+        # Static instructions come first so every prompt shares the same prefix
+        return f"""{STATIC_INSTRUCTIONS}
+Here is the context: {context}
 
-If the context doesn't provide any relevant information, answer with:
-[I couldn't find a good match in the document database for your query]
+Query: "{query}"
 
 Answer:"""
 
@@ -1,94 +1,209 @@
 import numpy as np
 import pandas as pd
 import scann
-from typing import Tuple, List, Optional
-from sklearn.metrics.pairwise import cosine_similarity
+import hnswlib
+from typing import Tuple, List, Optional, Union
 
 from config.settings import settings
 from services.embedding_service import embedding_service
+from utils.helpers import normalize_rows, quantize_int8
+from utils.kernels import NUMBA_AVAILABLE, dot_scores, best_dot_score, int8_dot_scores
 
 class SearchService:
     """Service for semantic search operations"""
     
-    def __init__(self, database: pd.DataFrame, embeddings: np.ndarray):
+    def __init__(self, database: pd.DataFrame, embeddings: np.ndarray, normalized: bool = False):
         self.database = database
-        self.embeddings = embeddings
+        # Plain dicts are much cheaper to hand out than rows built by DataFrame.iloc
+        self.docs = [
+            {'id': i, 'question': question, 'answer': answer}
+            for i, (question, answer) in enumerate(
+                zip(database['input_text'], database['output_text'])
+            )
+        ]
+        self.embeddings_shape = embeddings.shape
+        # Normalize embeddings once for cosine similarity; this buffer is shared by
+        # the index builder and exact search, so the raw embeddings are not kept.
+        # Already-normalized input (e.g. from shared memory) is used without a copy.
+        if normalized:
+            self.normalized_embeddings = embeddings
+        else:
+            self.normalized_embeddings = normalize_rows(embeddings)
+        # The int8 scoring kernel needs Numba; without it exact search stays float32
+        self.use_int8 = settings.EXACT_SEARCH_ENABLED and settings.EXACT_SEARCH_INT8 and NUMBA_AVAILABLE
+        if self.use_int8:
+            self.quantized_embeddings, self.quantization_scales = quantize_int8(
+                self.normalized_embeddings
+            )
         self.index = self._build_index()
+        if not settings.EXACT_SEARCH_ENABLED:
+            # The ANN index holds its own copy of the vectors
+            del self.normalized_embeddings
     
-    def _build_index(self) -> scann.scann_ops_pybind.ScannSearcher:
-        """Build ScaNN index for efficient similarity search"""
+    def _select_index_backend(self) -> str:
+        """Pick the ANN backend, preferring HNSW below the configured corpus size"""
+        backend = settings.SEARCH_INDEX_BACKEND
+        if backend == "auto":
+            return "hnsw" if len(self.normalized_embeddings) < settings.HNSW_MAX_ROWS else "scann"
+        if backend not in ("hnsw", "scann"):
+            raise ValueError(f"Unknown search index backend: {backend}")
+        return backend
+    
+    def _build_index(self) -> Union[hnswlib.Index, scann.scann_ops_pybind.ScannSearcher]:
+        """Build the approximate nearest neighbor index"""
         try:
-            # Normalize embeddings for cosine similarity
-            normalized_embeddings = self.embeddings / np.linalg.norm(
-                self.embeddings, axis=1, keepdims=True
-            )
-            
-            index = scann.scann_ops_pybind.builder(
-                normalized_embeddings, 
-                num_neighbors=10, 
-                distance_measure="dot_product"
-            ).tree(
-                num_leaves=settings.SEARCH_NUM_LEAVES,
-                num_leaves_to_search=settings.SEARCH_LEAVES_TO_SEARCH,
-                training_sample_size=min(settings.TRAINING_SAMPLE_SIZE, len(normalized_embeddings))
-            ).score_ah(
-                2,
-                anisotropic_quantization_threshold=0.2
-            ).reorder(100).build()
-            
-            return index
+            self.index_backend = self._select_index_backend()
+            if self.index_backend == "hnsw":
+                return self._build_hnsw_index()
+            return self._build_scann_index()
         except Exception as e:
             raise Exception(f"Failed to build search index: {str(e)}")
     
-    def semantic_search(self, query: str, k: int = 1) -> Tuple[List[int], List[float]]:
+    def _build_hnsw_index(self) -> hnswlib.Index:
+        """Build HNSW index for low-latency similarity search"""
+        normalized_embeddings = self.normalized_embeddings
+        num_embeddings, dim = normalized_embeddings.shape
+        
+        index = hnswlib.Index(space="cosine", dim=dim)
+        index.init_index(
+            max_elements=num_embeddings,
+            ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            M=settings.HNSW_M
+        )
+        index.add_items(normalized_embeddings)
+        index.set_ef(settings.HNSW_EF_SEARCH)
+        
+        return index
+    
+    def _build_scann_index(self) -> scann.scann_ops_pybind.ScannSearcher:
+        """Build ScaNN index with SOAR spilled assignments for efficient similarity search"""
+        normalized_embeddings = self.normalized_embeddings
+        num_embeddings = len(normalized_embeddings)
+        
+        # Size the partitioning from the actual corpus unless explicitly configured
+        num_leaves = settings.SEARCH_NUM_LEAVES or max(1, int(np.sqrt(num_embeddings)))
+        num_leaves_to_search = settings.SEARCH_LEAVES_TO_SEARCH or max(4, num_leaves // 4)
+        self.scann_leaves_to_search = min(num_leaves_to_search, num_leaves)
+        
+        index = scann.scann_ops_pybind.builder(
+            normalized_embeddings, 
+            num_neighbors=10, 
+            distance_measure="dot_product"
+        ).tree(
+            num_leaves=num_leaves,
+            num_leaves_to_search=self.scann_leaves_to_search,
+            training_sample_size=min(
+                max(settings.TRAINING_SAMPLE_SIZE, 10 * num_leaves),
+                num_embeddings
+            ),
+            spherical=True,
+            soar_lambda=settings.SCANN_SOAR_LAMBDA,
+            overretrieve_factor=settings.SCANN_OVERRETRIEVE_FACTOR
+        ).score_ah(
+            2,
+            anisotropic_quantization_threshold=0.2
+        ).reorder(settings.SCANN_REORDER_NUM_NEIGHBORS).build()
+        
+        return index
+    
+    def embed_query(self, query: str, use_cache: bool = True) -> np.ndarray:
+        """Embed a query and L2-normalize it for cosine similarity"""
+        query_embedding = embedding_service.get_single_embedding(query, use_cache=use_cache)
+        normalized_query = query_embedding / np.linalg.norm(query_embedding)
+        return normalized_query.astype(np.float32, copy=False)
+    
+    def semantic_search(
+        self,
+        query: str,
+        k: int = 1,
+        normalized_query: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], List[float]]:
         """Perform semantic search using approximate nearest neighbors"""
         try:
-            query_embedding = embedding_service.get_single_embedding(query)
+            if normalized_query is None:
+                normalized_query = self.embed_query(query)
             
-            # Normalize query embedding for cosine similarity
-            normalized_query = query_embedding / np.linalg.norm(query_embedding)
+            if self.index_backend == "hnsw":
+                # knn_query raises when asked for more neighbours than the index holds
+                k = min(k, self.index.get_current_count())
+                labels, distances = self.index.knn_query(normalized_query, k=k)
+                # hnswlib reports cosine distance; convert back to similarity
+                return labels[0].astype(np.int64).tolist(), (1 - distances[0]).tolist()
             
+            # Reorder only as many candidates as the requested k needs
             neighbors, distances = self.index.search(
                 normalized_query, 
-                final_num_neighbors=k
+                final_num_neighbors=k,
+                pre_reorder_num_neighbors=min(max(10, k * 5), settings.SCANN_REORDER_NUM_NEIGHBORS),
+                leaves_to_search=self.scann_leaves_to_search
             )
             
             return neighbors.tolist(), distances.tolist()
         except Exception as e:
             raise Exception(f"Semantic search failed: {str(e)}")
     
-    def exact_search(self, query: str, k: int = 1) -> Tuple[List[int], List[float]]:
+    def exact_search(
+        self,
+        query: str,
+        k: int = 1,
+        normalized_query: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], List[float]]:
         """Perform exact cosine similarity search"""
+        if not settings.EXACT_SEARCH_ENABLED:
+            raise Exception("Exact search is disabled")
+        
         try:
-            query_embedding = embedding_service.get_single_embedding(query)
+            if normalized_query is None:
+                normalized_query = self.embed_query(query)
+            
+            use_numba = (
+                not self.use_int8
+                and NUMBA_AVAILABLE
+                and len(self.normalized_embeddings) < settings.NUMBA_EXACT_SEARCH_MAX_ROWS
+            )
+            
+            # Fused score-and-argmax kernel for the single best match
+            if use_numba and k == 1:
+                best_index, best_score = best_dot_score(
+                    self.normalized_embeddings,
+                    np.ascontiguousarray(normalized_query, dtype=np.float32)
+                )
+                return [int(best_index)], [float(best_score)]
             
-            # Calculate cosine similarity
-            cos_sim_array = cosine_similarity(
-                [query_embedding], 
-                self.embeddings
-            )[0]
+            # Cosine similarity against the pre-normalized corpus
+            if self.use_int8:
+                query_codes, query_scale = quantize_int8(normalized_query)
+                cos_sim_array = int8_dot_scores(
+                    self.quantized_embeddings,
+                    self.quantization_scales,
+                    query_codes,
+                    np.float32(query_scale)
+                )
+            elif use_numba:
+                cos_sim_array = dot_scores(
+                    self.normalized_embeddings,
+                    np.ascontiguousarray(normalized_query, dtype=np.float32)
+                )
+            else:
+                cos_sim_array = self.normalized_embeddings @ normalized_query
+            
+            # Single best match needs one reduction instead of a partition and sort
+            if k == 1:
+                best_index = int(cos_sim_array.argmax())
+                return [best_index], [float(cos_sim_array[best_index])]
             
             # Get top k results
+            k = min(k, len(cos_sim_array))
             top_k_indices = np.argpartition(cos_sim_array, -k)[-k:]
-            top_k_indices = top_k_indices[np.argsort(cos_sim_array[top_k_indices])][::-1]
-            
-            similarities = cos_sim_array[top_k_indices].tolist()
+            top_k_scores = cos_sim_array[top_k_indices]
+            order = np.argsort(-top_k_scores)
             
-            return top_k_indices.tolist(), similarities
+            return top_k_indices[order].tolist(), top_k_scores[order].tolist()
         except Exception as e:
             raise Exception(f"Exact search failed: {str(e)}")
 
     def get_document(self, doc_id: int) -> Optional[dict]:
         """Retrieve document by ID"""
-        try:
-            if 0 <= doc_id < len(self.database):
-                row = self.database.iloc[doc_id]
-                return {
-                    'id': doc_id,
-                    'question': row['input_text'],
-                    'answer': row['output_text'],
-                    'embeddings': row['embeddings']
-                }
-            return None
-        except Exception as e:
-            raise Exception(f"Failed to get document {doc_id}: {str(e)}")
\ No newline at end of file
+        if 0 <= doc_id < len(self.docs):
+            return self.docs[doc_id]
+        return None
\ No newline at end of file
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from utils.kernels import dot_scores, best_dot_score, int8_dot_scores
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Mimic a corpus mapped from shared memory or a read-only .npy file"""
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((257, 768)).astype(np.float32)
+    query = rng.standard_normal(768).astype(np.float32)
+    return embeddings, query
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_dot_scores_matches_matmul(corpus, read_only):
+    embeddings, query = corpus
+    if read_only:
+        embeddings, query = _read_only(embeddings), _read_only(query)
+
+    np.testing.assert_allclose(dot_scores(embeddings, query), embeddings @ query, rtol=1e-4, atol=1e-3)
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_best_dot_score_matches_argmax(corpus, read_only):
+    embeddings, query = corpus
+    if read_only:
+        embeddings, query = _read_only(embeddings), _read_only(query)
+
+    best_index, best_score = best_dot_score(embeddings, query)
+    scores = embeddings @ query
+    assert best_index == scores.argmax()
+    assert best_score == pytest.approx(scores.max(), rel=1e-4)
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_int8_dot_scores_accumulates_exactly(read_only):
+    rng = np.random.default_rng(1)
+    codes = rng.integers(-127, 128, size=(64, 768), dtype=np.int8)
+    query_codes = rng.integers(-127, 128, size=768, dtype=np.int8)
+    scales = rng.random(64).astype(np.float32)
+    if read_only:
+        codes, query_codes, scales = _read_only(codes), _read_only(query_codes), _read_only(scales)
+
+    expected = (codes.astype(np.int64) @ query_codes.astype(np.int64)) * scales * np.float32(0.5)
+    np.testing.assert_allclose(
+        int8_dot_scores(codes, scales, query_codes, np.float32(0.5)), expected, rtol=1e-6
+    )
\ No newline at end of file
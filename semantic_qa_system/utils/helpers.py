@@ -1,37 +1,130 @@
+import asyncio
+import os
+import pickle
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import numpy as np
 from vertexai.language_models import TextEmbeddingModel
 
 from config.settings import settings
 
+@lru_cache(maxsize=1)
+def _default_embedding_model() -> TextEmbeddingModel:
+    """Embedding model shared by every batch and call in this process"""
+    return TextEmbeddingModel.from_pretrained(settings.EMBEDDING_MODEL)
+
+class AsyncRateLimiter:
+    """Token bucket limiting how often an async operation may start"""
+    
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated_at) * self.rate_per_second
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+async def encode_text_to_embedding_batched_async(
+    sentences: List[str],
+    api_calls_per_second: float = 20/60,
+    batch_size: int = 5,
+    max_in_flight: int = 5,
+    model: Optional[TextEmbeddingModel] = None
+) -> np.ndarray:
+    """Batch process text embeddings concurrently with rate limiting"""
+    if model is None:
+        model = _default_embedding_model()
+    
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limiter = AsyncRateLimiter(api_calls_per_second)
+    # Each batch writes its own slice, so the output is already in input order
+    embeddings = np.empty((len(sentences), settings.EMBEDDING_DIM), dtype=np.float32)
+    
+    async def embed_batch(start: int) -> None:
+        batch = sentences[start:start + batch_size]
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                batch_embeddings = await model.get_embeddings_async(batch)
+                embeddings[start:start + len(batch)] = [
+                    embedding.values for embedding in batch_embeddings
+                ]
+            except Exception as e:
+                print(f"Error processing batch {start // batch_size}: {str(e)}")
+                # Zero embeddings for failed batches
+                embeddings[start:start + len(batch)] = 0
+    
+    await asyncio.gather(*(
+        embed_batch(start) for start in range(0, len(sentences), batch_size)
+    ))
+    
+    return embeddings
+
 def encode_text_to_embedding_batched(
     sentences: List[str],
     api_calls_per_second: float = 20/60,
-    batch_size: int = 5
+    batch_size: int = 5,
+    max_in_flight: int = 5,
+    model: Optional[TextEmbeddingModel] = None
 ) -> np.ndarray:
-    """Batch process text embeddings with rate limiting"""
-    embeddings = []
-    delay = 1 / api_calls_per_second
-    
-    for i in range(0, len(sentences), batch_size):
-        batch = sentences[i:i + batch_size]
-        try:
-            batch_embeddings = TextEmbeddingModel.from_pretrained(
-                settings.EMBEDDING_MODEL
-            ).get_embeddings(batch)
-            
-            for embedding in batch_embeddings:
-                embeddings.append(embedding.values)
-            
-            # Rate limiting
-            if i + batch_size < len(sentences):
-                time.sleep(delay)
-                
-        except Exception as e:
-            print(f"Error processing batch {i//batch_size}: {str(e)}")
-            # Add zero embeddings for failed batches
-            for _ in batch:
-                embeddings.append(np.zeros(768))  # Adjust based on embedding dimension
-    
-    return np.array(embeddings)
\ No newline at end of file
+    """Synchronous wrapper around encode_text_to_embedding_batched_async"""
+    coroutine = encode_text_to_embedding_batched_async(
+        sentences=sentences,
+        api_calls_per_second=api_calls_per_second,
+        batch_size=batch_size,
+        max_in_flight=max_in_flight,
+        model=model
+    )
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    
+    # asyncio.run refuses to nest inside a running loop (Jupyter, async handlers),
+    # so give the coroutine its own loop on a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+def load_embeddings_file(
+    path: str = settings.EMBEDDINGS_PATH,
+    legacy_path: str = settings.LEGACY_EMBEDDINGS_PATH
+) -> np.ndarray:
+    """Load the float32 .npy embeddings as a read-only memory map, else the legacy pickle"""
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+    
+    # Fall back to the pickled embeddings until scripts/convert_embeddings.py has been run
+    with open(legacy_path, 'rb') as file:
+        embeddings = pickle.load(file)
+    return np.asarray(embeddings, dtype=np.float32)
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize each row into a single contiguous float32 array"""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    # Zero rows (e.g. failed embedding batches) stay zero and score 0, as with sklearn
+    norms[norms == 0] = 1
+    return np.ascontiguousarray(embeddings / norms, dtype=np.float32)
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization, returning the codes and per-row scales"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scale = np.max(np.abs(vectors), axis=-1) / 127
+    scale = np.where(scale > 0, scale, 1).astype(np.float32)
+    codes = np.round(vectors / scale[..., None]).astype(np.int8)
+    return codes, scale
\ No newline at end of file
@@ -0,0 +1,114 @@
+import os
+import numpy as np
+from typing import Tuple
+
+try:
+    import numba
+    from numba import njit, prange, get_num_threads, types
+    from numba.np.ufunc.parallel import _launch_threads
+    
+    # The kernels are called concurrently from the API's search thread pool; the
+    # workqueue layer Numba falls back to aborts on concurrent use, so require TBB
+    # or OpenMP unless the user picked a layer through NUMBA_THREADING_LAYER
+    if "NUMBA_THREADING_LAYER" not in os.environ:
+        numba.config.THREADING_LAYER = 'threadsafe'
+    # Load the layer now so a missing one falls back to numpy instead of failing later
+    _launch_threads()
+    NUMBA_AVAILABLE = True
+except (ImportError, ValueError):
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # Inputs are typed read-only so corpora mapped from shared memory or read-only
+    # .npy files dispatch too; writable arrays convert to these types implicitly
+    _CORPUS = types.Array(types.float32, 2, 'C', readonly=True)
+    _QUERY = types.Array(types.float32, 1, 'C', readonly=True)
+    
+    # Eager signature: compiled (or loaded from the on-disk cache) at import time
+    @njit(types.float32[::1](_CORPUS, _QUERY), parallel=True, fastmath=True, cache=True)
+    def dot_scores(embeddings, query):
+        """Dot product of every corpus row with the query, parallel over rows"""
+        n, d = embeddings.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(d):
+                acc += embeddings[i, j] * query[j]
+            scores[i] = acc
+        return scores
+
+    @njit(
+        types.Tuple((types.int64, types.float32))(_CORPUS, _QUERY, types.int64),
+        parallel=True,
+        fastmath=True,
+        cache=True
+    )
+    def _best_dot_score(embeddings, query, num_chunks):
+        """Index and score of the row with the largest dot product, in one pass over the corpus"""
+        n, d = embeddings.shape
+        num_chunks = max(1, min(n, num_chunks))
+        chunk_size = (n + num_chunks - 1) // num_chunks
+        best_indices = np.zeros(num_chunks, dtype=np.int64)
+        best_scores = np.full(num_chunks, -np.inf, dtype=np.float32)
+        # Each chunk keeps its own running maximum, so no score array is materialized
+        for c in prange(num_chunks):
+            for i in range(c * chunk_size, min(n, (c + 1) * chunk_size)):
+                acc = np.float32(0.0)
+                for j in range(d):
+                    acc += embeddings[i, j] * query[j]
+                if acc > best_scores[c]:
+                    best_scores[c] = acc
+                    best_indices[c] = i
+        best = 0
+        for c in range(1, num_chunks):
+            if best_scores[c] > best_scores[best]:
+                best = c
+        return best_indices[best], best_scores[best]
+
+    def best_dot_score(embeddings: np.ndarray, query: np.ndarray) -> Tuple[int, float]:
+        """Index and score of the row with the largest dot product"""
+        return _best_dot_score(embeddings, query, get_num_threads())
+
+    _CODES = types.Array(types.int8, 2, 'C', readonly=True)
+    _QUERY_CODES = types.Array(types.int8, 1, 'C', readonly=True)
+    _SCALES = types.Array(types.float32, 1, 'C', readonly=True)
+    
+    @njit(
+        types.float32[::1](_CODES, _SCALES, _QUERY_CODES, types.float32),
+        parallel=True,
+        fastmath=True,
+        cache=True
+    )
+    def int8_dot_scores(codes, scales, query_codes, query_scale):
+        """Dot products of int8-quantized corpus rows with an int8-quantized query"""
+        n, d = codes.shape
+        query = query_codes.astype(np.int32)
+        scores = np.empty(n, dtype=np.float32)
+        # Reads one byte per element and accumulates exactly in int32
+        for i in prange(n):
+            acc = np.int32(0)
+            for j in range(d):
+                acc += np.int32(codes[i, j]) * query[j]
+            scores[i] = np.float32(acc) * scales[i] * query_scale
+        return scores
+else:
+    def dot_scores(embeddings: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot product of every corpus row with the query"""
+        return embeddings @ query
+
+    def best_dot_score(embeddings: np.ndarray, query: np.ndarray) -> Tuple[int, float]:
+        """Index and score of the row with the largest dot product"""
+        scores = embeddings @ query
+        best_index = int(scores.argmax())
+        return best_index, float(scores[best_index])
+
+def warmup() -> None:
+    """Run the kernels once on a tiny input so the first query skips JIT and thread-pool startup"""
+    embeddings = np.ones((2, 4), dtype=np.float32)
+    embeddings.flags.writeable = False
+    query = np.ones(4, dtype=np.float32)
+    dot_scores(embeddings, query)
+    best_dot_score(embeddings, query)
+    if NUMBA_AVAILABLE:
+        codes = np.ones((2, 4), dtype=np.int8)
+        int8_dot_scores(codes, np.ones(2, dtype=np.float32), codes[0], np.float32(1))
\ No newline at end of file
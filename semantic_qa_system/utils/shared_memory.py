@@ -0,0 +1,47 @@
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+import numpy as np
+
+# Header holding the matrix shape, padded so the float32 data stays cache-line aligned
+_HEADER_BYTES = 64
+
+def _untrack(shm: SharedMemory) -> None:
+    """Stop the resource tracker from unlinking the block when this process exits"""
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+def create_shared_embeddings(name: str, embeddings: np.ndarray) -> SharedMemory:
+    """Copy a float32 embedding matrix into a named POSIX shared memory block"""
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    size = _HEADER_BYTES + embeddings.nbytes
+    try:
+        shm = SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        # Either a running instance owns the block or a killed one left it behind;
+        # the two look the same from here, so never unlink it on the caller's behalf
+        raise FileExistsError(
+            f"Shared memory block '{name}' already exists. If no server is using it, remove it "
+            f"with: SHARED_EMBEDDINGS_NAME={name} python -m scripts.share_embeddings --unlink"
+        ) from None
+    _untrack(shm)
+    
+    np.ndarray(2, dtype=np.int64, buffer=shm.buf)[:] = embeddings.shape
+    np.ndarray(embeddings.shape, dtype=np.float32, buffer=shm.buf, offset=_HEADER_BYTES)[:] = embeddings
+    return shm
+
+def attach_shared_embeddings(name: str) -> Tuple[SharedMemory, np.ndarray]:
+    """Map an embedding matrix created by create_shared_embeddings without copying it"""
+    shm = SharedMemory(name=name)
+    _untrack(shm)
+    
+    shape = tuple(int(n) for n in np.ndarray(2, dtype=np.int64, buffer=shm.buf))
+    embeddings = np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=_HEADER_BYTES)
+    embeddings.flags.writeable = False
+    # The caller must keep the SharedMemory handle alive for as long as the array is used
+    return shm, embeddings
+
+def unlink_shared_embeddings(name: str) -> None:
+    """Remove a shared embedding block once no worker needs it"""
+    shm = SharedMemory(name=name)
+    shm.close()
+    shm.unlink()